@@ -0,0 +1,288 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from datetime import datetime, timedelta
+
+# Shared data logic for the Streamlit app (app.py) and the headless
+# batch reporter (batch_report.py). Nothing in here may import streamlit.
+
+# --- SCHEMA DEFINITION ---
+# Dropped 'N' column. We will manage data without it.
+COLUMNS = ["Date", "Description", "Amount", "Necessity", "Method", "Category", "Tag", "More info"]
+
+# Vibrant Palette for Charts
+VIBRANT_COLORS = [
+    "#F87171", "#FB923C", "#FACC15", "#4ADE80", "#60A5FA",
+    "#818CF8", "#A78BFA", "#F472B6", "#FB7185", "#2DD4BF"
+]
+
+TIME_FILTERS = ["All Time", "This Month", "Last 14 Days", "Last 30 Days", "Last 60 Days", "Last 90 Days", "Last 180 Days", "Last 365 Days", "This Year"]
+
+# --- HELPER FUNCTIONS ---
+def clean_amount(val, currency_symbol="$"):
+    """Parses currency strings like '$1,200.00' into floats."""
+    if pd.isna(val): return 0.0
+    if isinstance(val, (int, float)): return float(val)
+    if isinstance(val, str):
+        cleaned = val.replace(currency_symbol, '').replace('$', '').replace(',', '').strip()
+        if not cleaned: return 0.0
+        try: return float(cleaned)
+        except: return 0.0
+    return 0.0
+
+def load_dataset(file_source, on_error=None):
+    """Loads and standardizes dataset from file object or path.
+
+    Errors are passed to `on_error` (e.g. st.error) and an empty frame is
+    returned. Without a handler the exception propagates to the caller.
+    """
+    try:
+        df = pd.read_csv(file_source)
+
+        # 1. Clean Date
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        df = df.dropna(subset=['Date']) # Drop invalid dates
+
+        # 2. Standardize Schema
+        # Remove legacy 'N' if exists
+        if 'N' in df.columns:
+            df = df.drop(columns=['N'])
+
+        # Add missing columns
+        for col in COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+
+        # 3. Type Conversion
+        if 'Category' in df.columns: df['Category'] = df['Category'].astype(str)
+        if 'Method' in df.columns: df['Method'] = df['Method'].astype(str)
+
+        # 4. Return as formatted strings for UI (Date)
+        df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
+
+        return df[COLUMNS]
+    except Exception as e:
+        if on_error is None:
+            raise
+        on_error(f"Failed to load data: {e}")
+        return pd.DataFrame(columns=COLUMNS)
+
+# --- FILTERING ---
+def filter_period(df, time_filter, today=None):
+    """Restricts a frame with a 'Date_dt' column to one of TIME_FILTERS."""
+    today = today or datetime.now()
+    if time_filter == "This Month":
+        return df[df['Date_dt'].dt.to_period('M') == today.strftime('%Y-%m')]
+    if time_filter == "This Year":
+        return df[df['Date_dt'].dt.year == today.year]
+    if time_filter.startswith("Last ") and time_filter.endswith(" Days"):
+        cutoff = today - timedelta(days=int(time_filter.split()[1]))
+        return df[df['Date_dt'] >= cutoff]
+    return df
+
+def prepare_frame(df, currency_symbol="$"):
+    """Adds the parsed 'Date_dt' and 'Amount_Val' columns, newest first."""
+    df = df.copy()
+    df['Date_dt'] = pd.to_datetime(df['Date'])
+    df['Amount_Val'] = df['Amount'].apply(clean_amount, currency_symbol=currency_symbol)
+    # Sort by date DESC by default for Log/Dashboard consistency
+    return df.sort_values('Date_dt', ascending=False)
+
+# --- AGGREGATION ---
+def summarize(df):
+    """KPIs for a prepared frame (see prepare_frame)."""
+    total_spend = df['Amount_Val'].sum()
+    # Total Spend / Number of Unique Months in the selection (min 1)
+    unique_months = df['Date_dt'].dt.to_period('M').nunique()
+    return {
+        "total_spend": float(total_spend),
+        "transactions": int(len(df)),
+        "avg_transaction": float(total_spend / len(df)) if len(df) else 0.0,
+        "avg_monthly": float(total_spend / unique_months) if unique_months > 0 else float(total_spend),
+    }
+
+def category_split(df):
+    """Spend per category as a two-column frame (Category, Amount_Val)."""
+    # str() keeps blank categories as 'nan' (like SpendIndex) so the split adds up to the total
+    return df.groupby(df['Category'].map(str))['Amount_Val'].sum().reset_index()
+
+def monthly_trend(df):
+    """Spend per calendar month as a two-column frame (Month, Amount_Val)."""
+    months = df['Date_dt'].dt.to_period('M').astype(str).rename('Month')
+    return df.groupby(months)['Amount_Val'].sum().reset_index()
+
+# --- PREFIX-SUM INDEX ---
+class SpendIndex:
+    """Daily cumulative spend, overall and per category.
+
+    cum[i] holds the total spent from the first day up to and including
+    day i, so any date-range total is two lookups. Entries are applied
+    incrementally with add()/remove() instead of rescanning the frame.
+    """
+
+    def __init__(self, start=None, overall=None, by_category=None):
+        self.start = start # np.datetime64 day of cum[0], None while empty
+        self.overall = overall if overall is not None else np.zeros(0)
+        self.by_category = by_category or {}
+
+    @classmethod
+    def from_frame(cls, df, currency_symbol="$"):
+        """Builds the index in one pass over a frame with the app schema."""
+        if df.empty:
+            return cls()
+        days = pd.to_datetime(df['Date']).values.astype('datetime64[D]')
+        amounts = df['Amount'].apply(clean_amount, currency_symbol=currency_symbol).to_numpy(dtype=float)
+        start = days.min()
+        offsets = (days - start).astype(int)
+        n = int(offsets.max()) + 1
+        overall = np.cumsum(np.bincount(offsets, weights=amounts, minlength=n), dtype=float)
+        by_category = {}
+        # Same keys as add(): str() turns missing categories into 'nan'
+        categories = df['Category'].map(str).to_numpy()
+        for cat in np.unique(categories):
+            mask = categories == cat
+            by_category[cat] = np.cumsum(np.bincount(offsets[mask], weights=amounts[mask], minlength=n), dtype=float)
+        return cls(start, overall, by_category)
+
+    def __len__(self):
+        return len(self.overall)
+
+    def _day(self, date):
+        return np.datetime64(pd.Timestamp(date).date(), 'D')
+
+    def _extend(self, day):
+        """Grows every array so that `day` falls inside the index."""
+        if self.start is None:
+            self.start = day
+            self.overall = np.zeros(1)
+            return
+        before = int((self.start - day).astype(int))
+        if before > 0:
+            pad = lambda a: np.concatenate([np.zeros(before), a])
+            self.overall = pad(self.overall)
+            self.by_category = {cat: pad(cum) for cat, cum in self.by_category.items()}
+            self.start = day
+        after = int((day - self.start).astype(int)) - len(self.overall) + 1
+        if after > 0:
+            # Cumulative sums carry their last value forward
+            pad = lambda a: np.concatenate([a, np.full(after, a[-1])])
+            self.overall = pad(self.overall)
+            self.by_category = {cat: pad(cum) for cat, cum in self.by_category.items()}
+
+    def add(self, date, amount, category):
+        """Applies one logged entry (use remove() to undo it)."""
+        day = self._day(date)
+        self._extend(day)
+        i = int((day - self.start).astype(int))
+        category = str(category)
+        if category not in self.by_category:
+            self.by_category[category] = np.zeros(len(self.overall))
+        self.overall[i:] += amount
+        self.by_category[category][i:] += amount
+
+    def remove(self, date, amount, category):
+        self.add(date, -amount, category)
+
+    def add_frame(self, df, currency_symbol="$", sign=1):
+        for date, amount, category in zip(df['Date'], df['Amount'], df['Category']):
+            self.add(date, sign * clean_amount(amount, currency_symbol), category)
+
+    def remove_frame(self, df, currency_symbol="$"):
+        self.add_frame(df, currency_symbol, sign=-1)
+
+    def _cumulative(self, categories=None):
+        """Cumulative array for all spend, or the sum of the given categories."""
+        if categories is None:
+            return self.overall
+        cum = np.zeros(len(self.overall))
+        for cat in categories:
+            if cat in self.by_category:
+                cum = cum + self.by_category[cat]
+        return cum
+
+    def total(self, start, end, categories=None):
+        """Total spent between two dates (inclusive) in O(1) per category."""
+        if self.start is None:
+            return 0.0
+        last = len(self.overall) - 1
+        s = max(int((self._day(start) - self.start).astype(int)), 0)
+        e = min(int((self._day(end) - self.start).astype(int)), last)
+        if e < 0 or s > last or s > e:
+            return 0.0
+        arrays = [self.overall] if categories is None else [self.by_category[cat] for cat in categories if cat in self.by_category]
+        return float(sum(cum[e] - (cum[s - 1] if s > 0 else 0.0) for cum in arrays))
+
+    def rolling(self, window_days, categories=None, end=None):
+        """Trailing `window_days` spend for every day in the history.
+
+        Pass `end` (e.g. today) to carry the series past the last logged day.
+        """
+        cum = self._cumulative(categories)
+        if end is not None and self.start is not None:
+            after = int((self._day(end) - self.start).astype(int)) - len(cum) + 1
+            if after > 0:
+                cum = np.concatenate([cum, np.full(after, cum[-1])])
+        lagged = np.concatenate([np.zeros(window_days), cum[:-window_days]]) if len(cum) > window_days else np.zeros(len(cum))
+        dates = pd.date_range(pd.Timestamp(self.start), periods=len(cum), freq='D') if len(cum) else pd.DatetimeIndex([])
+        return pd.Series(cum - lagged, index=dates, name='Amount_Val')
+
+    def period_over_period(self, start, end, categories=None):
+        """(current, previous): a date range and the same range one year earlier."""
+        year = pd.DateOffset(years=1)
+        current = self.total(start, end, categories)
+        previous = self.total(pd.Timestamp(start) - year, pd.Timestamp(end) - year, categories)
+        return current, previous
+
+# --- CHARTS ---
+def category_pie(cat_group):
+    fig_pie = px.pie(cat_group, values='Amount_Val', names='Category', hole=0.5, color_discrete_sequence=VIBRANT_COLORS)
+    fig_pie.update_traces(
+        textinfo='percent+label',
+        textfont_size=16,
+        hovertemplate="<b>%{label}</b><br>%{percent}<br>$%{value:,.2f}<extra></extra>"
+    )
+    fig_pie.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        font_color="white",
+        margin=dict(t=0, b=0, l=0, r=0),
+        showlegend=True
+    )
+    return fig_pie
+
+def monthly_bar(time_group):
+    fig_bar = px.bar(
+        time_group,
+        x='Month',
+        y='Amount_Val',
+        color='Amount_Val',
+        color_continuous_scale=VIBRANT_COLORS,
+        text='Amount_Val' # Show value inside bar
+    )
+    fig_bar.update_traces(
+        textposition='inside',
+        texttemplate='$%{y:,.0f}',
+        hovertemplate="<b>%{x}</b><br>$%{y:,.2f}<extra></extra>"
+    )
+    fig_bar.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        font_color="white",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(t=0, b=0, l=0, r=0)
+    )
+    return fig_bar
+
+def rolling_line(rolling_series, window_days):
+    frame = rolling_series.rename_axis('Date').reset_index()
+    fig_line = px.line(frame, x='Date', y='Amount_Val', color_discrete_sequence=VIBRANT_COLORS[5:])
+    fig_line.update_traces(
+        hovertemplate=f"<b>%{{x|%Y-%m-%d}}</b><br>Last {window_days} days: $%{{y:,.2f}}<extra></extra>"
+    )
+    fig_line.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        font_color="white",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(t=0, b=0, l=0, r=0),
+        xaxis_title=None,
+        yaxis_title=None
+    )
+    return fig_line
@@ -1,12 +1,15 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime, timedelta
 import io
 import os
 import zipfile
 import json
 import uuid
+from analytics import (
+    COLUMNS, TIME_FILTERS, SpendIndex, clean_amount, load_dataset as _load_dataset, filter_period,
+    prepare_frame, summarize, category_split, monthly_trend, category_pie, monthly_bar, rolling_line
+)
 
 # --- CONFIGURATION & SETUP ---
 ST_PAGE_TITLE = "Purchase Tracker"
@@ -110,58 +113,15 @@ st.markdown(f"""
     </style>
     """, unsafe_allow_html=True)
 
-# Vibrant Palette for Charts
-VIBRANT_COLORS = [
-    "#F87171", "#FB923C", "#FACC15", "#4ADE80", "#60A5FA", 
-    "#818CF8", "#A78BFA", "#F472B6", "#FB7185", "#2DD4BF"
-]
-
-# --- SCHEMA DEFINITION ---
-# Dropped 'N' column. We will manage data without it.
-COLUMNS = ["Date", "Description", "Amount", "Necessity", "Method", "Category", "Tag", "More info"]
-
 # --- HELPER FUNCTIONS ---
-def clean_amount(val):
-    """Parses currency strings like '$1,200.00' into floats."""
-    if pd.isna(val): return 0.0
-    if isinstance(val, (int, float)): return float(val)
-    if isinstance(val, str):
-        cleaned = val.replace(config['currency_symbol'], '').replace('$', '').replace(',', '').strip()
-        if not cleaned: return 0.0
-        try: return float(cleaned)
-        except: return 0.0
-    return 0.0
-
+# Parsing/aggregation lives in analytics.py so batch_report.py can share it.
 def load_dataset(file_source):
-    """Loads and standardizes dataset from file object or path."""
-    try:
-        df = pd.read_csv(file_source)
-        
-        # 1. Clean Date
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df = df.dropna(subset=['Date']) # Drop invalid dates
-        
-        # 2. Standardize Schema
-        # Remove legacy 'N' if exists
-        if 'N' in df.columns:
-            df = df.drop(columns=['N'])
-            
-        # Add missing columns
-        for col in COLUMNS:
-            if col not in df.columns:
-                df[col] = None
-                
-        # 3. Type Conversion
-        if 'Category' in df.columns: df['Category'] = df['Category'].astype(str)
-        if 'Method' in df.columns: df['Method'] = df['Method'].astype(str)
-        
-        # 4. Return as formatted strings for UI (Date)
-        df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
-        
-        return df[COLUMNS]
-    except Exception as e:
-        st.error(f"Failed to load data: {e}")
-        return pd.DataFrame(columns=COLUMNS)
+    """Loads and standardizes dataset, reporting failures in the UI."""
+    return _load_dataset(file_source, on_error=st.error)
+
+def rebuild_index():
+    """Recomputes the prefix-sum index after st.session_state.data is replaced."""
+    st.session_state.spend_index = SpendIndex.from_frame(st.session_state.data, config['currency_symbol'])
 
 def save_local(df):
     """Saves DataFrame to local CSV path defined in config."""
@@ -189,6 +149,8 @@ def save_settings():
 # --- SESSION STATE INIT ---
 if 'data' not in st.session_state:
     st.session_state.data = pd.DataFrame(columns=COLUMNS)
+if 'spend_index' not in st.session_state:
+    rebuild_index()
 if 'categories' not in st.session_state:
     st.session_state.categories = list(config['categories'])
 if 'methods' not in st.session_state:
@@ -202,6 +164,7 @@ if IS_LOCAL_MODE and not st.session_state.initialized:
         loaded_df = load_dataset(config['csv_path'])
         if not loaded_df.empty:
             st.session_state.data = loaded_df
+            rebuild_index()
             # Update filters/lists based on data
             unique_cats = [x for x in loaded_df['Category'].dropna().unique() if x != 'nan']
             st.session_state.categories = list(set(st.session_state.categories + unique_cats))
@@ -229,6 +192,7 @@ with st.sidebar:
             if st.button("Load Imported Data", use_container_width=True):
                 df_new = load_dataset(uploaded_file)
                 st.session_state.data = df_new
+                rebuild_index()
                 
                 # Update Categories
                 new_cats = [x for x in df_new['Category'].dropna().unique() if x != 'nan']
@@ -268,12 +232,15 @@ with st.sidebar:
                     'IS_LOCAL_MODE = os.environ.get("PURCHASE_TRACKER_LOCAL", "False").lower() == "true"',
                     'IS_LOCAL_MODE = True'
                 )
+                with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "analytics.py"), "r") as f:
+                    analytics_code = f.read()
                 reqs = "streamlit\npandas\nplotly\n"
                 readme = "# Purchase Tracker (Local)\n1. Install Python\n2. pip install -r requirements.txt\n3. streamlit run app.py"
                 
                 zip_buffer = io.BytesIO()
                 with zipfile.ZipFile(zip_buffer, "w") as zf:
                     zf.writestr("app.py", source_code_local)
+                    zf.writestr("analytics.py", analytics_code)
                     zf.writestr("requirements.txt", reqs)
                     zf.writestr("README.txt", readme)
                 return zip_buffer.getvalue()
@@ -295,10 +262,7 @@ with st.sidebar:
     
     # Filters
     st.markdown("### Filters")
-    time_filter = st.selectbox(
-        "Period", 
-        ["All Time", "This Month", "Last 14 Days", "Last 30 Days", "Last 60 Days", "Last 90 Days", "Last 180 Days", "Last 365 Days", "This Year"]
-    )
+    time_filter = st.selectbox("Period", TIME_FILTERS)
     
     st.markdown("### Categories")
     
@@ -408,38 +372,11 @@ if st.session_state.get('show_help', False):
 # FILTER DATA
 df_filtered = st.session_state.data.copy()
 if not df_filtered.empty:
-    df_filtered['Date_dt'] = pd.to_datetime(df_filtered['Date'])
-    
-    # Sort by date DESC by default for Log/Dashboard consistency
-    df_filtered = df_filtered.sort_values('Date_dt', ascending=False)
+    # Adds Date_dt / Amount_Val and sorts by date DESC for Log/Dashboard consistency
+    df_filtered = prepare_frame(df_filtered, config['currency_symbol'])
     
     # Time Filter
-    today = datetime.now()
-    if time_filter == "This Month":
-        df_filtered = df_filtered[df_filtered['Date_dt'].dt.to_period('M') == today.strftime('%Y-%m')]
-    elif time_filter == "Last 14 Days":
-        cutoff = today - timedelta(days=14)
-        df_filtered = df_filtered[df_filtered['Date_dt'] >= cutoff]
-    elif time_filter == "Last 30 Days":
-        cutoff = today - timedelta(days=30)
-        df_filtered = df_filtered[df_filtered['Date_dt'] >= cutoff]
-    elif time_filter == "Last 60 Days":
-        cutoff = today - timedelta(days=60)
-        df_filtered = df_filtered[df_filtered['Date_dt'] >= cutoff]
-    elif time_filter == "Last 90 Days":
-        cutoff = today - timedelta(days=90)
-        df_filtered = df_filtered[df_filtered['Date_dt'] >= cutoff]
-    elif time_filter == "Last 180 Days":
-        cutoff = today - timedelta(days=180)
-        df_filtered = df_filtered[df_filtered['Date_dt'] >= cutoff]
-    elif time_filter == "Last 365 Days":
-        cutoff = today - timedelta(days=365)
-        df_filtered = df_filtered[df_filtered['Date_dt'] >= cutoff]
-    elif time_filter == "This Year":
-        df_filtered = df_filtered[df_filtered['Date_dt'].dt.year == today.year]
-    elif time_filter == "Custom Days":
-        cutoff = today - timedelta(days=custom_days)
-        df_filtered = df_filtered[df_filtered['Date_dt'] >= cutoff]
+    df_filtered = filter_period(df_filtered, time_filter)
         
     # Category Filter
     if selected_cats:
@@ -488,6 +425,7 @@ if not show_log:
                     "More info": ""
                 }
                 st.session_state.data = pd.concat([st.session_state.data, pd.DataFrame([new_row])], ignore_index=True)
+                st.session_state.spend_index.add(date, clean_amount(amt, config['currency_symbol']), cat)
                 
                 if IS_LOCAL_MODE:
                     save_local(st.session_state.data)
@@ -496,67 +434,48 @@ if not show_log:
 
     # ANALYTICS
     if not df_filtered.empty:
-        df_filtered['Amount_Val'] = df_filtered['Amount'].apply(clean_amount)
-        total_spend = df_filtered['Amount_Val'].sum()
-        
-        # Calculate Monthly Average
-        # We use the filtered period to determine the denominator, or just count unique months in the filtered data.
-        # Logic: If I filter "Last 30 Days", I have 1 or 2 months. 
-        # Better: Total Spend / Number of Unique Months in the selection (min 1)
-        unique_months = df_filtered['Date_dt'].dt.to_period('M').nunique()
-        avg_monthly = total_spend / unique_months if unique_months > 0 else total_spend
+        kpis = summarize(df_filtered)
         
         # KPIs
         k1, k2, k3, k4 = st.columns(4)
-        k1.metric("Total Spend", f"{config['currency_symbol']}{total_spend:,.2f}")
-        k2.metric("Transactions", len(df_filtered))
-        k3.metric("Avg. Transaction", f"{config['currency_symbol']}{total_spend/len(df_filtered):,.2f}")
-        k4.metric("Avg. / Month", f"{config['currency_symbol']}{avg_monthly:,.2f}")
+        k1.metric("Total Spend", f"{config['currency_symbol']}{kpis['total_spend']:,.2f}")
+        k2.metric("Transactions", kpis['transactions'])
+        k3.metric("Avg. Transaction", f"{config['currency_symbol']}{kpis['avg_transaction']:,.2f}")
+        k4.metric("Avg. / Month", f"{config['currency_symbol']}{kpis['avg_monthly']:,.2f}")
         
         # Charts
         c_left, c_right = st.columns(2)
         
         with c_left:
             st.subheader("Spending by Category")
-            cat_group = df_filtered.groupby('Category')['Amount_Val'].sum().reset_index()
-            fig_pie = px.pie(cat_group, values='Amount_Val', names='Category', hole=0.5, color_discrete_sequence=VIBRANT_COLORS)
-            fig_pie.update_traces(
-                textinfo='percent+label',
-                textfont_size=16,
-                hovertemplate="<b>%{label}</b><br>%{percent}<br>$%{value:,.2f}<extra></extra>"
-            )
-            fig_pie.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)", 
-                font_color="white", 
-                margin=dict(t=0, b=0, l=0, r=0),
-                showlegend=True
-            )
-            st.plotly_chart(fig_pie, use_container_width=True)
+            st.plotly_chart(category_pie(category_split(df_filtered)), use_container_width=True)
             
         with c_right:
             st.subheader("Monthly Trend")
-            df_filtered['Month'] = df_filtered['Date_dt'].dt.to_period('M').astype(str)
-            time_group = df_filtered.groupby('Month')['Amount_Val'].sum().reset_index()
-            fig_bar = px.bar(
-                time_group, 
-                x='Month', 
-                y='Amount_Val', 
-                color='Amount_Val', 
-                color_continuous_scale=VIBRANT_COLORS,
-                text='Amount_Val' # Show value inside bar
-            )
-            fig_bar.update_traces(
-                textposition='inside',
-                texttemplate='$%{y:,.0f}',
-                hovertemplate="<b>%{x}</b><br>$%{y:,.2f}<extra></extra>"
-            )
-            fig_bar.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)", 
-                font_color="white", 
-                plot_bgcolor="rgba(0,0,0,0)", 
-                margin=dict(t=0, b=0, l=0, r=0)
-            )
-            st.plotly_chart(fig_bar, use_container_width=True)
+            st.plotly_chart(monthly_bar(monthly_trend(df_filtered)), use_container_width=True)
+
+    # ROLLING & PERIOD-OVER-PERIOD
+    # Uses the prefix-sum index over the full history, so only the category filter applies.
+    if not st.session_state.data.empty:
+        spend_index = st.session_state.spend_index
+        # Same rule as the KPI cards: filter whenever any category is checked
+        index_cats = selected_cats or None
+        today = datetime.now()
+        
+        st.subheader("Rolling Spend")
+        c_chart, c_compare = st.columns([3, 1])
+        
+        with c_compare:
+            window = st.selectbox("Window", [7, 30, 90, 365], index=1, format_func=lambda d: f"{d} days")
+            
+            mtd, mtd_prev = spend_index.period_over_period(today.replace(day=1), today, index_cats)
+            st.metric("Month to Date", f"{config['currency_symbol']}{mtd:,.2f}", delta=f"{mtd - mtd_prev:+,.2f} vs last year", delta_color="inverse")
+            
+            recent, recent_prev = spend_index.period_over_period(today - timedelta(days=window - 1), today, index_cats)
+            st.metric(f"Last {window} Days", f"{config['currency_symbol']}{recent:,.2f}", delta=f"{recent - recent_prev:+,.2f} vs last year", delta_color="inverse")
+            
+        with c_chart:
+            st.plotly_chart(rolling_line(spend_index.rolling(window, index_cats, end=today), window), use_container_width=True)
 
 # --- VIEW: LOG / EDIT ---
 else:
@@ -564,7 +483,7 @@ else:
     
     if not df_filtered.empty:
         # Prepare for Editor
-        df_edit = df_filtered.copy()
+        df_edit = df_filtered.drop(columns=['Amount_Val'])
         # Add a unique ID for deletion tracking if not present (we use index here for simplicity in display)
         df_edit.insert(0, "Delete", False)
         
@@ -599,7 +518,8 @@ else:
                 # Get indices of rows marked for deletion
                 indices_to_drop = edited_df[edited_df['Delete']].index
                 
-                # Drop from main state
+                # Drop from main state (and back the rows out of the prefix sums)
+                st.session_state.spend_index.remove_frame(st.session_state.data.loc[indices_to_drop], config['currency_symbol'])
                 st.session_state.data = st.session_state.data.drop(indices_to_drop)
                 
                 if IS_LOCAL_MODE:
@@ -0,0 +1,215 @@
+"""Headless batch reporting for Purchase Tracker CSV exports.
+
+Processes every CSV in a directory across a process pool and writes one
+summary per file (totals, monthly trend, category split) as JSON, CSV
+and/or static HTML. Uses the same loading and aggregation as app.py.
+
+Usage:
+    python batch_report.py exports/ -o reports/ --period "Last 30 Days" --workers 8
+    python batch_report.py exports/ -o reports/ --period "This Month" --as-of 2026-09-30
+"""
+import argparse
+import html
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from analytics import (
+    TIME_FILTERS, load_dataset, filter_period, prepare_frame,
+    summarize, category_split, monthly_trend, category_pie, monthly_bar
+)
+
+FORMATS = ["json", "csv", "html"]
+CSV_OUTPUT_SUFFIXES = ("_monthly.csv", "_categories.csv")
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Purchase Report - {name}</title>
+<style>
+body {{ background-color: #000000; color: #FFFFFF; font-family: 'Inter', sans-serif; margin: 32px; }}
+.kpis {{ display: flex; gap: 16px; }}
+.kpi {{ background-color: #121212; border: 1px solid #2A2A2A; border-radius: 12px; padding: 16px; flex: 1; }}
+.kpi .value {{ font-size: 36px; font-weight: 700; }}
+.kpi .label {{ color: #AAAAAA; }}
+</style>
+</head>
+<body>
+<h1>{name}</h1>
+<p>Period: {period}</p>
+<div class="kpis">{kpis}</div>
+<h2>Spending by Category</h2>
+{category_chart}
+<h2>Monthly Trend</h2>
+{monthly_chart}
+</body>
+</html>
+"""
+
+
+def build_report(csv_path, period="All Time", currency_symbol="$", as_of=None):
+    """Loads one CSV and returns its summary as plain (JSON-ready) data.
+
+    `as_of` is the reference date for the period (default: now); entries
+    after that day are left out.
+    """
+    df = load_dataset(csv_path)
+    if not df.empty:
+        df = prepare_frame(df, currency_symbol)
+        if as_of is not None:
+            df = df[df['Date_dt'] < as_of + timedelta(days=1)]
+        df = filter_period(df, period, as_of)
+    if df.empty:
+        kpis = {"total_spend": 0.0, "transactions": 0, "avg_transaction": 0.0, "avg_monthly": 0.0}
+        categories, months = [], []
+    else:
+        kpis = summarize(df)
+        categories = category_split(df).sort_values('Amount_Val', ascending=False).to_dict('records')
+        months = monthly_trend(df).to_dict('records')
+    return {
+        "source": os.path.basename(csv_path),
+        "period": period,
+        "as_of": as_of.strftime('%Y-%m-%d') if as_of is not None else None,
+        "currency_symbol": currency_symbol,
+        **kpis,
+        "category_split": categories,
+        "monthly_trend": months,
+    }
+
+
+def render_html(report):
+    """Static HTML page; plotly.js is loaded from the CDN to keep files small."""
+    sym = report['currency_symbol']
+    labels = [
+        ("Total Spend", f"{sym}{report['total_spend']:,.2f}"),
+        ("Transactions", f"{report['transactions']}"),
+        ("Avg. Transaction", f"{sym}{report['avg_transaction']:,.2f}"),
+        ("Avg. / Month", f"{sym}{report['avg_monthly']:,.2f}"),
+    ]
+    kpis = "".join(
+        f'<div class="kpi"><div class="label">{label}</div><div class="value">{value}</div></div>'
+        for label, value in labels
+    )
+    if report['transactions'] and report['category_split']:
+        cat_group = pd.DataFrame(report['category_split'], columns=['Category', 'Amount_Val'])
+        time_group = pd.DataFrame(report['monthly_trend'], columns=['Month', 'Amount_Val'])
+        category_chart = category_pie(cat_group).to_html(full_html=False, include_plotlyjs="cdn")
+        monthly_chart = monthly_bar(time_group).to_html(full_html=False, include_plotlyjs=False)
+    else:
+        category_chart = monthly_chart = "<p>No data in current filter.</p>"
+    period = report['period'] + (f" (as of {report['as_of']})" if report['as_of'] else "")
+    # File names come from other users' exports, so escape them
+    return HTML_TEMPLATE.format(
+        name=html.escape(report['source']),
+        period=html.escape(period),
+        kpis=kpis,
+        category_chart=category_chart,
+        monthly_chart=monthly_chart,
+    )
+
+
+def process_file(csv_path, output_dir, formats, period, currency_symbol, as_of=None):
+    """Worker entry point: builds one report and writes the requested formats."""
+    report = build_report(csv_path, period, currency_symbol, as_of)
+    stem = os.path.join(output_dir, os.path.splitext(os.path.basename(csv_path))[0])
+    written = []
+
+    if "json" in formats:
+        with open(f"{stem}.json", "w") as f:
+            json.dump(report, f, indent=4)
+        written.append(f"{stem}.json")
+    if "csv" in formats:
+        pd.DataFrame(report['monthly_trend'], columns=['Month', 'Amount_Val']).to_csv(f"{stem}{CSV_OUTPUT_SUFFIXES[0]}", index=False)
+        pd.DataFrame(report['category_split'], columns=['Category', 'Amount_Val']).to_csv(f"{stem}{CSV_OUTPUT_SUFFIXES[1]}", index=False)
+        written += [f"{stem}{suffix}" for suffix in CSV_OUTPUT_SUFFIXES]
+    if "html" in formats:
+        with open(f"{stem}.html", "w") as f:
+            f.write(render_html(report))
+        written.append(f"{stem}.html")
+
+    return written
+
+
+def find_csvs(input_dir, output_dir=None):
+    """CSVs to report on. When reports are written next to the inputs, the
+    tool's own X_monthly.csv / X_categories.csv are skipped if X.csv is there."""
+    names = {
+        name for name in os.listdir(input_dir)
+        if name.lower().endswith(".csv") and os.path.isfile(os.path.join(input_dir, name))
+    }
+    if output_dir and os.path.realpath(output_dir) == os.path.realpath(input_dir):
+        names = {
+            name for name in names
+            if not any(name.endswith(suffix) and name[:-len(suffix)] + ".csv" in names for suffix in CSV_OUTPUT_SUFFIXES)
+        }
+    return sorted(os.path.join(input_dir, name) for name in names)
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate spending reports for a directory of Purchase Tracker CSVs.")
+    parser.add_argument("input_dir", help="Directory containing exported CSV files")
+    parser.add_argument("-o", "--output-dir", default="reports", help="Where to write reports (default: reports)")
+    parser.add_argument("-f", "--formats", default="json,csv,html",
+                        help=f"Comma-separated output formats from {', '.join(FORMATS)} (default: all)")
+    parser.add_argument("-p", "--period", default="All Time", choices=TIME_FILTERS, help="Time filter, as in the dashboard")
+    parser.add_argument("-a", "--as-of", type=parse_date, default=None,
+                        help="Reference date YYYY-MM-DD for the period; later entries are ignored (default: today)")
+    parser.add_argument("-c", "--currency-symbol", default="$", help="Currency symbol to strip from amounts (default: $)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+                        help="Number of worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    args.formats = [x.strip().lower() for x in args.formats.split(",") if x.strip()]
+    unknown = [x for x in args.formats if x not in FORMATS]
+    if unknown or not args.formats:
+        parser.error(f"unknown format(s): {', '.join(unknown) or '(none given)'}")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if not os.path.isdir(args.input_dir):
+        parser.error(f"not a directory: {args.input_dir}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    csv_files = find_csvs(args.input_dir, args.output_dir)
+    if not csv_files:
+        print(f"No CSV files found in {args.input_dir}")
+        return 0
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    workers = min(args.workers, len(csv_files))
+    failures = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(process_file, path, args.output_dir, args.formats, args.period, args.currency_symbol, args.as_of): path
+            for path in csv_files
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                future.result()
+                print(f"OK    {path}")
+            except Exception as e:
+                failures += 1
+                print(f"FAIL  {path}: {type(e).__name__}: {e}", file=sys.stderr)
+
+    print(f"Processed {len(csv_files) - failures}/{len(csv_files)} files with {workers} worker(s) -> {args.output_dir}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+
+from analytics import load_dataset, prepare_frame, summarize
+from batch_report import main
+
+# Runs the batch reporter end to end on a temp directory of sample CSVs.
+# Run with: python check_batch_report.py
+
+FILES = {
+    "valid.csv": "Date,Description,Amount,Necessity,Method,Category,Tag,More info\n"
+                 "2026-08-03,Coffee,\"$1,200.50\",2,Cash,Food,,\n"
+                 "2026-09-10,Bus,$3,5,Card,Transport,,\n"
+                 "2026-09-12,Gift,4.5,1,Cash,,,\n"
+                 "bad,x,1,1,Cash,Food,,\n",
+    "blank_categories.csv": "Date,Amount,Category\n2026-09-01,$4.50,\n2026-09-02,6,\n",
+    "no_category_column.csv": "Date,Amount\n2026-09-01,10\n",
+    "food_categories.csv": "Date,Amount,Category\n2026-09-05,7,Food\n",
+    "<b>x.csv": "Date,Amount,Category\n2026-09-05,1,Food\n",
+    "header_only.csv": "Date,Amount,Category\n",
+    "no_date.csv": "foo,bar\n1,2\n",
+}
+GOOD = [name for name in FILES if name != "no_date.csv"]
+
+def outputs(name):
+    stem = name[:-4]
+    return [f"{stem}.json", f"{stem}_monthly.csv", f"{stem}_categories.csv", f"{stem}.html"]
+
+def check_reports(input_dir, output_dir):
+    for name in GOOD:
+        for out in outputs(name):
+            assert os.path.isfile(os.path.join(output_dir, out)), f"missing {out}"
+        with open(os.path.join(output_dir, name[:-4] + ".json")) as f:
+            report = json.load(f)
+        df = load_dataset(os.path.join(input_dir, name))
+        expected = summarize(prepare_frame(df)) if not df.empty else {"total_spend": 0.0, "transactions": 0}
+        assert abs(report["total_spend"] - expected["total_spend"]) < 1e-9, name
+        assert report["transactions"] == expected["transactions"], name
+        split = sum(row["Amount_Val"] for row in report["category_split"])
+        assert abs(split - report["total_spend"]) < 1e-9, f"{name}: category split {split} != total {report['total_spend']}"
+    assert not os.path.exists(os.path.join(output_dir, "no_date.json"))
+    with open(os.path.join(output_dir, "<b>x.html")) as f:
+        assert "<h1>&lt;b&gt;x.csv</h1>" in f.read()
+
+with tempfile.TemporaryDirectory() as tmp:
+    input_dir = os.path.join(tmp, "in")
+    os.makedirs(input_dir)
+    for name, content in FILES.items():
+        with open(os.path.join(input_dir, name), "w") as f:
+            f.write(content)
+
+    # 1. Separate output directory; the file without a Date column fails
+    output_dir = os.path.join(tmp, "out")
+    assert main([input_dir, "-o", output_dir, "-w", "2"]) == 1
+    check_reports(input_dir, output_dir)
+
+    # 2. Reports next to the inputs, run twice: own outputs are not re-read,
+    #    but a real export named food_categories.csv still is
+    os.remove(os.path.join(input_dir, "no_date.csv"))
+    GOOD.remove("<b>x.csv")
+    os.remove(os.path.join(input_dir, "<b>x.csv"))
+    for _ in range(2):
+        assert main([input_dir, "-o", input_dir, "-w", "2"]) == 0
+    assert not os.path.exists(os.path.join(input_dir, "valid_monthly_monthly.csv"))
+    assert os.path.exists(os.path.join(input_dir, "food_categories_categories.csv"))
+    for name in GOOD:
+        for out in outputs(name):
+            assert os.path.isfile(os.path.join(input_dir, out)), f"missing {out}"
+
+    # 3. --as-of picks the reference month and drops later entries
+    as_of_in = os.path.join(tmp, "as_of_in")
+    os.makedirs(as_of_in)
+    with open(os.path.join(as_of_in, "valid.csv"), "w") as f:
+        f.write(FILES["valid.csv"])
+    as_of_dir = os.path.join(tmp, "as_of")
+    assert main([as_of_in, "-o", as_of_dir, "-f", "json", "-p", "This Month", "--as-of", "2026-08-31"]) == 0
+    with open(os.path.join(as_of_dir, "valid.json")) as f:
+        report = json.load(f)
+    assert report["as_of"] == "2026-08-31" and report["transactions"] == 1 and report["total_spend"] == 1200.5
+    assert main([as_of_in, "-o", as_of_dir, "-f", "json", "--as-of", "2026-09-10"]) == 0
+    with open(os.path.join(as_of_dir, "valid.json")) as f:
+        assert json.load(f)["transactions"] == 2
+
+print("batch_report OK")
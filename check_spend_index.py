@@ -0,0 +1,71 @@
+import io
+import numpy as np
+import pandas as pd
+from analytics import SpendIndex, clean_amount, load_dataset
+
+# Compares SpendIndex lookups against a brute-force pandas sum.
+# Run with: python check_spend_index.py
+
+def brute_total(df, start, end, categories=None):
+    dates = pd.to_datetime(df['Date'])
+    mask = (dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end))
+    if categories is not None:
+        mask &= df['Category'].map(str).isin(categories)
+    return float(sum(clean_amount(x) for x in df.loc[mask, 'Amount']))
+
+def check_totals(index, df, label):
+    ranges = [
+        ("2023-03-01", "2023-06-30", None),
+        ("2020-01-01", "2030-01-01", ["Food"]),
+        ("2024-02-02", "2024-02-02", ["Transport", "Rent"]),
+        ("2030-01-01", "2031-01-01", None),
+        ("2019-01-01", "2022-12-31", None),
+        ("2023-01-01", "2025-12-31", ["nan"]),
+    ]
+    for start, end, cats in ranges:
+        got, expected = index.total(start, end, cats), brute_total(df, start, end, cats)
+        assert abs(got - expected) < 1e-6, f"{label}: total({start}, {end}, {cats}) = {got}, expected {expected}"
+
+rng = np.random.default_rng(0)
+n = 500
+df = pd.DataFrame({
+    "Date": (pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 900, n), unit="D")).strftime("%Y-%m-%d"),
+    "Amount": [f"${x:,.2f}" for x in rng.uniform(1, 2000, n)],
+    "Category": rng.choice(["Food", "Transport", "Rent", None], n),
+})
+
+# 1. Bulk build
+index = SpendIndex.from_frame(df)
+check_totals(index, df, "from_frame")
+
+# 2. Incremental build, with entries before/after the range that are then removed
+inc = SpendIndex.from_frame(df.iloc[:250])
+inc.add_frame(df.iloc[250:])
+extra = pd.DataFrame({"Date": ["2020-05-05", "2027-01-01"], "Amount": ["10", "$5"], "Category": ["Gifts", None]})
+inc.add_frame(extra)
+inc.remove_frame(extra)
+check_totals(inc, df, "incremental")
+
+# 3. Rolling windows, extended past the last logged day
+end = pd.Timestamp("2026-01-01")
+for window in [7, 30, 365]:
+    rolling = index.rolling(window, ["Food", "Rent"], end=end)
+    assert rolling.index[-1] == end, f"rolling({window}) ends at {rolling.index[-1]}"
+    for day in rolling.index[[0, 100, 400, -1]]:
+        expected = brute_total(df, day - pd.Timedelta(days=window - 1), day, ["Food", "Rent"])
+        assert abs(rolling[day] - expected) < 1e-6, f"rolling({window}) at {day.date()}"
+
+# 4. Blank categories from a CSV, then deleting that row
+csv = "Date,Description,Amount,Category\n2024-01-05,Coffee,$4.50,\n2024-01-06,Bus,3,Transport\n"
+loaded = load_dataset(io.StringIO(csv))
+blank = SpendIndex.from_frame(loaded)
+assert blank.overall.dtype == float and all(cum.dtype == float for cum in blank.by_category.values())
+check_totals(blank, loaded, "blank category")
+blank.remove_frame(loaded.iloc[:1])
+assert blank.total("2024-01-01", "2024-01-31", ["nan"]) == 0.0
+
+only_blank = SpendIndex.from_frame(loaded.iloc[:1])
+assert only_blank.total("2024-01-05", "2024-01-05", ["nan"]) == 4.5
+only_blank.remove_frame(loaded.iloc[:1])
+
+print("SpendIndex OK")